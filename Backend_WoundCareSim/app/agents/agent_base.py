@@ -2,10 +2,8 @@ from abc import ABC
 import logging
 from openai import AsyncOpenAI
 
-from app.core.config import (
-    OPENAI_API_KEY,
-    OPENAI_CHAT_MODEL,
-)
+from app.core.config import OPENAI_CHAT_MODEL
+from app.core.http_client import get_openai_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,9 +16,13 @@ class BaseAgent(ABC):
     """
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
         self.model = OPENAI_CHAT_MODEL
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Resolved per call so agents survive the app closing its pool
+        return get_openai_client()
+
     async def run(
         self,
         system_prompt: str,
@@ -1,9 +1,60 @@
 import json
+from array import array
+from typing import List, Optional
 
 from pydantic_core import ValidationError
 from app.agents.agent_base import BaseAgent
 from app.utils.schema import EvaluatorResponse
 
+# Procedure action events (see state_machine._ALLOWED_BY_ORDINAL),
+# interned to small ints in the order they must happen. pick_material
+# may happen at any point during cleaning, so it is not ordered.
+ACTION_IDS = {
+    "action_handwash": 0,
+    "action_clean": 1,
+    "action_dress": 2,
+    "action_secure_dressing": 3,
+}
+
+_PROCEDURE = array("B", range(len(ACTION_IDS)))
+
+# DFA over ACTION_IDS: state = number of procedure actions done in order.
+# Repeating the last action keeps the state; anything else out of order
+# lands in the dead state.
+_DEAD = len(ACTION_IDS) + 1
+_TRANSITIONS = tuple(
+    bytes(
+        state + 1 if action == state
+        else state if action == state - 1
+        else _DEAD
+        for action in range(len(ACTION_IDS))
+    )
+    for state in range(len(ACTION_IDS) + 1)
+)
+
+
+def check_action_order(actions: List[str]) -> Optional[bool]:
+    """
+    Return True if the recognised procedure actions occur in the
+    required order, False if they do not, and None when there are no
+    recognised actions to check. Unrecognised actions are ignored.
+    """
+    ids = array("B", (ACTION_IDS[a] for a in actions if a in ACTION_IDS))
+    if not ids:
+        return None
+
+    # Common case: a clean in-order prefix, compared as one buffer
+    if ids == _PROCEDURE[:len(ids)]:
+        return True
+
+    state = 0
+    for action_id in ids:
+        state = _TRANSITIONS[state][action_id]
+        if state == _DEAD:
+            return False
+    return True
+
+
 class ClinicalAgent(BaseAgent):
     """
     Evaluates the student's clinical and procedural correctness.
@@ -19,9 +70,12 @@ class ClinicalAgent(BaseAgent):
         student_input: str,
         scenario_metadata: dict,
         rag_response: str,
+        actions: Optional[List[str]] = None,
     ) -> EvaluatorResponse:
         """
         Evaluate clinical correctness and return a structured object.
+        If performed actions are given, their order is checked up front
+        and the result is passed to the model.
         """
 
         system_prompt = (
@@ -53,6 +107,18 @@ class ClinicalAgent(BaseAgent):
             f"REFERENCE GUIDELINES: {rag_response}\n"
         )
 
+        if actions is not None:
+            in_order = check_action_order(actions)
+            order = (
+                "not checked" if in_order is None
+                else "correct" if in_order
+                else "OUT OF ORDER"
+            )
+            user_prompt += (
+                f"PERFORMED ACTIONS: {', '.join(actions) or 'none'}\n"
+                f"ACTION ORDER CHECK: {order}\n"
+            )
+
         raw_response = await self.run(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
@@ -67,7 +133,7 @@ class ClinicalAgent(BaseAgent):
             response_data["step"] = current_step
             response_data["agent_name"] = "ClinicalAgent"
 
-            return EvaluatorResponse(**response_data)
+            return EvaluatorResponse.model_validate(response_data)
         # UPDATED EXCEPT BLOCK: Catch ValidationError
         except (json.JSONDecodeError, ValueError, ValidationError) as e:
             print(f"Agent Parsing Failed: {e}")
@@ -67,7 +67,7 @@ class CommunicationAgent(BaseAgent):
             response_data["agent_name"] = "CommunicationAgent"
 
             # Validate against Pydantic Schema
-            structured_output = EvaluatorResponse(**response_data)
+            structured_output = EvaluatorResponse.model_validate(response_data)
             
             return structured_output
 
@@ -65,7 +65,7 @@ class KnowledgeAgent(BaseAgent):
             response_data["step"] = current_step
             response_data["agent_name"] = "KnowledgeAgent"
 
-            return EvaluatorResponse(**response_data)
+            return EvaluatorResponse.model_validate(response_data)
 
         # UPDATED EXCEPT BLOCK: Catch ValidationError
         except (json.JSONDecodeError, ValueError, ValidationError) as e:
@@ -7,6 +7,7 @@ from app.services.scenario_service import (
     get_scenario,
     list_scenarios
 )
+from app.services.scenario_loader import invalidate
 
 router = APIRouter(prefix="/scenario", tags=["Scenario"])
 
@@ -14,7 +15,9 @@ router = APIRouter(prefix="/scenario", tags=["Scenario"])
 @router.post("/create")
 def create(data: Dict):
     try:
-        return create_scenario(data)
+        scenario = create_scenario(data)
+        invalidate(scenario["scenario_id"])
+        return scenario
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -22,7 +25,9 @@ def create(data: Dict):
 @router.post("/update/{scenario_id}")
 def update(scenario_id: str, data: Dict):
     try:
-        return update_scenario(scenario_id, data)
+        scenario = update_scenario(scenario_id, data)
+        invalidate(scenario_id)
+        return scenario
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -30,7 +35,9 @@ def update(scenario_id: str, data: Dict):
 @router.post("/delete/{scenario_id}")
 def delete(scenario_id: str):
     try:
-        return delete_scenario(scenario_id)
+        result = delete_scenario(scenario_id)
+        invalidate(scenario_id)
+        return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -1,12 +1,15 @@
+import asyncio
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.services.session_manager import SessionManager
 from app.services.scenario_loader import load_scenario
 from app.services.evaluation_service import EvaluationService
 from app.core.coordinator import Coordinator
-from app.core.state_machine import Step, next_step
+from app.core.state_machine import Step
 from app.utils.schema import EvaluatorResponse
 from app.rag.retriever import retrieve_with_rag
 
@@ -16,7 +19,10 @@ router = APIRouter(prefix="/session", tags=["Session"])
 # Core services
 session_manager = SessionManager()
 coordinator = Coordinator()
-evaluation_service = EvaluationService(coordinator=coordinator)
+evaluation_service = EvaluationService(
+    coordinator=coordinator,
+    session_manager=session_manager,
+)
 
 
 # ----------------------------
@@ -40,11 +46,12 @@ class EvalInput(BaseModel):
 # ----------------------------
 
 @router.post("/start")
-def start_session(req: StartSessionRequest):
+async def start_session(req: StartSessionRequest):
     try:
-        scenario = load_scenario(req.scenario_id)
+        # Firestore client is blocking; keep it off the event loop
+        scenario = await asyncio.to_thread(load_scenario, req.scenario_id)
 
-        session_id = session_manager.create_session(
+        session_id = await session_manager.create_session(
             scenario_id=req.scenario_id,
             student_id=req.student_id,
             scenario_metadata=scenario
@@ -52,7 +59,7 @@ def start_session(req: StartSessionRequest):
 
         return {
             "session_id": session_id,
-            "current_step": Step.HISTORY.value,
+            "current_step": Step.HISTORY.label,
             "scenario_summary": {
                 "scenario_id": scenario["scenario_id"],
                 "title": scenario["title"],
@@ -67,20 +74,97 @@ def start_session(req: StartSessionRequest):
 
 @router.post("/step")
 async def session_step(payload: EvalInput):
+    return await _process_step(payload)
+
+
+@router.post("/step/stream")
+async def session_step_stream(payload: EvalInput):
+    """
+    Same as /step, but returns NDJSON, one JSON object per line, each
+    sent as soon as it is ready: step info first, then the evaluation,
+    the next step and the assistant response. A failure after the
+    stream has started is reported as a final {"error": ...} line.
+    """
+    parts = _step_parts(payload)
+
+    # Session lookup happens here, so an unknown session is still a 404
+    first = await parts.__anext__()
+
+    return StreamingResponse(
+        _ndjson_stream(first, parts),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _ndjson_stream(
+    first: Dict[str, Any],
+    parts: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    yield orjson.dumps(first) + b"\n"
+    try:
+        async for part in parts:
+            yield orjson.dumps(part) + b"\n"
+    except HTTPException as e:
+        yield orjson.dumps({"error": e.detail}) + b"\n"
+
+
+async def _process_step(payload: EvalInput) -> Dict[str, Any]:
+    response: Dict[str, Any] = {}
+    async for part in _step_parts(payload):
+        response.update(part)
+    return response
+
+
+async def _step_parts(payload: EvalInput) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run one step, yielding each part of the response as it completes.
+    /step merges the parts into one document; /step/stream sends them
+    line by line.
+    """
     sid = payload.session_id
-    session = session_manager.get_session(sid)
+    session = await session_manager.get_session(sid)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    cur_step = session["current_step"]
+    cur_step = session["current_step"].label
     scenario_id = session["scenario_id"]
 
-    rag_result = None
+    yield {"session_id": sid, "current_step": cur_step}
+
+    # ----------------------------
+    # Evaluation aggregation (Week-4)
+    # ----------------------------
+    try:
+        evaluation = await evaluation_service.aggregate_evaluations(
+            session_id=sid,
+            evaluator_outputs=payload.evaluator_outputs,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Evaluation aggregation failed: {str(e)}",
+        )
+
+    yield {"evaluation": evaluation}
+
+    # ----------------------------
+    # Step transition
+    # ----------------------------
+    next_s = None
+    try:
+        next_s = await session_manager.advance_step(sid)
+    except Exception:
+        pass
+
+    if next_s is not None:
+        yield {"next_step": next_s.label}
 
     # ----------------------------
     # Optional RAG retrieval
     # ----------------------------
+    rag_result = None
+
     if payload.user_input:
         try:
             rag_result = await retrieve_with_rag(
@@ -92,7 +176,7 @@ async def session_step(payload: EvalInput):
                 ),
             )
 
-            session_manager.add_rag_result(
+            await session_manager.add_rag_result(
                 sid,
                 {
                     "step": cur_step,
@@ -104,24 +188,13 @@ async def session_step(payload: EvalInput):
         except Exception as e:
             print(f"RAG retrieval failed: {str(e)}")
 
-    # ----------------------------
-    # Evaluation aggregation (Week-4)
-    # ----------------------------
-    try:
-        evaluation = await evaluation_service.aggregate_evaluations(
-            evaluator_outputs=payload.evaluator_outputs,
-            step=cur_step,
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Evaluation aggregation failed: {str(e)}",
-        )
+    if rag_result:
+        yield {"assistant_response": rag_result["text"]}
 
     # ----------------------------
     # Session logging
     # ----------------------------
-    session_manager.add_log(
+    await session_manager.add_log(
         sid,
         {
             "step": cur_step,
@@ -130,30 +203,3 @@ async def session_step(payload: EvalInput):
             "rag_used": rag_result is not None,
         },
     )
-
-    # ----------------------------
-    # Step transition
-    # ----------------------------
-    next_s = None
-    try:
-        next_s = next_step(Step(cur_step))
-        session["current_step"] = next_s.value
-    except Exception:
-        pass
-
-    # ----------------------------
-    # Response
-    # ----------------------------
-    response = {
-        "session_id": sid,
-        "current_step": cur_step,
-        "evaluation": evaluation,
-    }
-
-    if rag_result:
-        response["assistant_response"] = rag_result["text"]
-
-    if next_s:
-        response["next_step"] = next_s.value
-
-    return response
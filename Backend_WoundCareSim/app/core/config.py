@@ -7,3 +7,9 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 VECTOR_STORE_ID = os.getenv("VECTOR_STORE_ID")
 EMBEDDING_MODEL = os.getenv("OPENAI_EMBED_MODEL")
 OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL")
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Second-tier RAG cache that also serves paraphrased queries.
+# Costs one embedding call per uncached query, so it is off by default.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
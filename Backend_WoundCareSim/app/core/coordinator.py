@@ -36,15 +36,11 @@ class Coordinator:
                 "confidence": ev.confidence,
             }
 
-            all_strengths.extend(
-                [f"[{ev.agent_name}] {s}" for s in ev.strengths]
-            )
-            all_issues.extend(
-                [f"[{ev.agent_name}] {i}" for i in ev.issues_detected]
-            )
-            explanations.append(
-                f"[{ev.agent_name}] {ev.explanation}"
-            )
+            # Build the agent tag once, not once per strength/issue
+            prefix = "[" + ev.agent_name + "] "
+            all_strengths.extend(prefix + s for s in ev.strengths)
+            all_issues.extend(prefix + i for i in ev.issues_detected)
+            explanations.append(prefix + ev.explanation)
 
         score_result = aggregate_scores(evaluations, current_step)
         readiness_result = check_readiness(
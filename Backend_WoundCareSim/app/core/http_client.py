@@ -0,0 +1,59 @@
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import OPENAI_API_KEY
+
+# One pooled client for all outbound OpenAI traffic (agents, RAG, vector store)
+# so TCP/TLS connections are reused instead of re-established per caller.
+MAX_KEEPALIVE_CONNECTIONS = 20
+MAX_CONNECTIONS = 100
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_http_client: httpx.AsyncClient | None = None
+_openai_client: AsyncOpenAI | None = None
+# Pool the current _openai_client was built on
+_openai_pool: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared AsyncClient, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=MAX_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            )
+        )
+    return _http_client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Returns an AsyncOpenAI bound to the current shared pool.
+
+    Call this at request time rather than storing the result: once the
+    app lifespan closes the pool, a new one (and a new OpenAI client on
+    top of it) is created on next use.
+    """
+    global _openai_client, _openai_pool
+    http_client = get_http_client()
+    if _openai_client is None or _openai_pool is not http_client:
+        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+        _openai_pool = http_client
+    return _openai_client
+
+
+async def close_http_client() -> None:
+    """
+    Closes the shared AsyncClient. Called on app shutdown.
+    """
+    global _http_client, _openai_client, _openai_pool
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _openai_client = None
+        _openai_pool = None
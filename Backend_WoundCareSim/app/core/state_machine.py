@@ -1,37 +1,50 @@
-from enum import Enum
+from enum import IntEnum
 
-class Step(Enum):
-    HISTORY = "history"
-    ASSESSMENT = "assessment"
-    CLEANING = "cleaning"
-    DRESSING = "dressing"
-    COMPLETED = "completed"
+class Step(IntEnum):
+    HISTORY = 0
+    ASSESSMENT = 1
+    CLEANING = 2
+    DRESSING = 3
+    COMPLETED = 4
 
-# valid forward transitions
-_VALID_TRANSITIONS = {
-    Step.HISTORY: Step.ASSESSMENT,
-    Step.ASSESSMENT: Step.CLEANING,
-    Step.CLEANING: Step.DRESSING,
-    Step.DRESSING: Step.COMPLETED,
-}
+    @property
+    def label(self) -> str:
+        """Lower-case name used in API payloads, e.g. "history"."""
+        return self.name.lower()
+
+# valid forward transitions, indexed by Step ordinal
+_NEXT = (
+    Step.ASSESSMENT,    # HISTORY
+    Step.CLEANING,      # ASSESSMENT
+    Step.DRESSING,      # CLEANING
+    Step.COMPLETED,     # DRESSING
+    None,               # COMPLETED
+)
 
 def next_step(current_step: Step):
     """Return the next step or raise ValueError if none."""
-    if current_step not in _VALID_TRANSITIONS:
-        raise ValueError(f"No next step for {current_step}")
-    return _VALID_TRANSITIONS[current_step]
+    nxt = _NEXT[current_step]
+    if nxt is None:
+        raise ValueError(f"No next step for {current_step.name}")
+    return nxt
+
+# allowed event types per step, indexed by Step ordinal, built once at import
+_EMPTY = frozenset()
+
+_ALLOWED_BY_ORDINAL = (
+    frozenset({"voice_transcript", "question_asked"}),                  # HISTORY
+    frozenset({"mcq_answer", "visual_assessment"}),                     # ASSESSMENT
+    frozenset({"action_handwash", "action_clean", "pick_material"}),    # CLEANING
+    frozenset({"action_dress", "action_secure_dressing"}),              # DRESSING
+    _EMPTY,                                                             # COMPLETED
+)
 
 def validate_action(step: Step, event_type: str) -> bool:
     """
     Naive validator: return True if event_type is allowed for the given step.
     This is a simple scaffold; business rules will be added later.
     """
-    mapping = {
-        Step.HISTORY: {"voice_transcript", "question_asked"},
-        Step.ASSESSMENT: {"mcq_answer", "visual_assessment"},
-        Step.CLEANING: {"action_handwash", "action_clean", "pick_material"},
-        Step.DRESSING: {"action_dress", "action_secure_dressing"},
-        Step.COMPLETED: set(),
-    }
-    allowed = mapping.get(step, set())
-    return event_type in allowed
+    # Unknown steps (strings, out-of-range ints) allow nothing
+    if not isinstance(step, Step):
+        return False
+    return event_type in _ALLOWED_BY_ORDINAL[step]
@@ -1,10 +1,42 @@
+from contextlib import asynccontextmanager
+from typing import Any
+
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.core.http_client import get_http_client, close_http_client
 from app.api.session_routes import router as session_router
 from app.api.scenario_routes import router as scenario_router
 
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson (Rust) instead of stdlib json.
+    NumPy values in payloads are serialized natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The app owns the shared outbound pool: open it on startup, close it
+    # on shutdown. Callers look it up per request, so a later startup
+    # simply opens a fresh pool.
+    get_http_client()
+    yield
+    await close_http_client()
+
+
 app = FastAPI(
     title="VR Nursing Education System Backend",
-    version="Week-3"
+    version="Week-3",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 @app.get("/health")
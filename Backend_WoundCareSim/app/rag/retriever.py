@@ -1,19 +1,12 @@
 import logging
-from openai import AsyncOpenAI  # Use AsyncOpenAI for async/await
+from typing import Any, Dict, List
 from app.core.config import (
     OPENAI_API_KEY,
     VECTOR_STORE_ID,
     OPENAI_CHAT_MODEL,
 )
-
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY not configured")
-
-if not VECTOR_STORE_ID:
-    raise RuntimeError("VECTOR_STORE_ID not configured")
-
-# Initialize Async Client
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+from app.core.http_client import get_openai_client
+from app.rag.vector_client import VectorClient
 
 async def retrieve_with_rag(
     query: str,
@@ -23,9 +16,18 @@ async def retrieve_with_rag(
     """
     Perform RAG using the stateless OpenAI Responses API.
     """
+    # Checked per call (as VectorClient does on construction) so that
+    # importing this module, e.g. for Retriever, needs no OpenAI config
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+
+    if not VECTOR_STORE_ID:
+        raise RuntimeError("VECTOR_STORE_ID not configured")
+
     try:
         # The simplified Responses API call
-        response = await client.responses.create(
+        # Fetched per call: the shared pool is recreated after app shutdown
+        response = await get_openai_client().responses.create(
             model=OPENAI_CHAT_MODEL,
             
             # 1. Vector Store ID goes INSIDE the tool definition here
@@ -59,3 +61,33 @@ async def retrieve_with_rag(
     except Exception as e:
         logging.error(f"RAG Retrieval failed: {e}")
         raise e
+
+
+class Retriever:
+    """
+    Chunk-level retrieval for a scenario step, backed by VectorClient.
+    """
+
+    def __init__(self, vector_client: VectorClient):
+        self.vector_client = vector_client
+
+    async def get_context(
+        self,
+        query: str,
+        scenario_id: str,
+        step: str,
+        top_k: int = 4,
+    ) -> List[Dict[str, Any]]:
+        return await self.vector_client.query(query, scenario_id, step, top_k)
+
+    async def batch_get_context(
+        self,
+        queries: List[str],
+        scenario_id: str,
+        step: str,
+        top_k: int = 4,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve context for several queries in parallel.
+        """
+        return await self.vector_client.batch_query(queries, scenario_id, step, top_k)
@@ -1,23 +1,208 @@
-from typing import List
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional
 
-from app.core.config import OPENAI_API_KEY, VECTOR_STORE_ID
+import httpx
+import numpy as np
+from openai import AsyncOpenAI
+
+from app.core.config import (
+    EMBEDDING_MODEL,
+    OPENAI_API_KEY,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    VECTOR_STORE_ID,
+)
+from app.core.http_client import get_openai_client
+from app.utils.query_cache import QueryCache, SemanticCache
+
+# Repeated transcripts (student retries, front-end resends) reuse results
+QUERY_CACHE_SIZE = 1000
+QUERY_CACHE_TTL_SECONDS = 300
+SEMANTIC_CACHE_SIZE = 1024
+
+# Files are tagged with a scenario_id attribute when attached to the
+# store. General guidance used by every scenario carries this value.
+SHARED_SCENARIO_ID = "shared"
+
+
+def scenario_filter(scenario_id: str) -> Dict[str, Any]:
+    """
+    Vector store search filter: chunks of this scenario plus shared ones.
+    """
+    return {
+        "type": "or",
+        "filters": [
+            {"type": "eq", "key": "scenario_id", "value": scenario_id},
+            {"type": "eq", "key": "scenario_id", "value": SHARED_SCENARIO_ID},
+        ],
+    }
 
 class VectorClient:
     """
-    Handles ONLY OpenAI Vector Store file management.
-    No querying logic lives here.
+    Handles OpenAI Vector Store file management and direct chunk search.
+    Embedding and similarity search run inside the vector store.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = QUERY_CACHE_SIZE,
+        cache_ttl_seconds: float = QUERY_CACHE_TTL_SECONDS,
+        http_client: Optional[httpx.AsyncClient] = None,
+        semantic_cache_enabled: bool = SEMANTIC_CACHE_ENABLED,
+        openai_client: Optional[AsyncOpenAI] = None,
+    ):
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY not configured")
 
         if not VECTOR_STORE_ID:
             raise RuntimeError("VECTOR_STORE_ID not configured")
 
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        if semantic_cache_enabled and not EMBEDDING_MODEL:
+            raise RuntimeError("OPENAI_EMBED_MODEL not configured")
+
+        # A caller-supplied client or pool is owned by the caller; otherwise
+        # the shared pool is looked up on each use (see the client property)
+        if openai_client is None and http_client is not None:
+            openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+        self._client = openai_client
         self.vector_store_id = VECTOR_STORE_ID
+        self._cache = QueryCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        # Searches currently in flight, so concurrent identical queries share one
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._semantic = (
+            SemanticCache(
+                max_size=SEMANTIC_CACHE_SIZE,
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                ttl_seconds=cache_ttl_seconds,
+            )
+            if semantic_cache_enabled
+            else None
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is not None:
+            return self._client
+        return get_openai_client()
+
+    async def query(
+        self,
+        query_text: str,
+        scenario_id: str,
+        step: str,
+        top_k: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the vector store and return the top_k matching chunks.
+        Results are restricted to files tagged with scenario_id (or shared).
+        step only partitions the caches; files are not tagged per step.
+        Identical query text is served from memory instead of being
+        embedded and searched again, and identical queries that arrive
+        while a search is running wait on that search. With the semantic
+        cache enabled, close paraphrases of a cached query also hit.
+        """
+        key = (
+            hashlib.sha256(query_text.encode()).digest(),
+            scenario_id,
+            step,
+            top_k,
+        )
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Join an in-flight lookup first, so concurrent identical queries
+        # share one embedding call as well as one search
+        task = self._inflight.get(key)
+        if task is None:
+            # Paraphrases only share results within the same search parameters
+            scope = (scenario_id, step, top_k)
+            task = asyncio.ensure_future(
+                self._lookup(key, query_text, top_k, scope)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller cancelling does not cancel the shared search
+        return await asyncio.shield(task)
+
+    async def batch_query(
+        self,
+        queries: List[str],
+        scenario_id: str,
+        step: str,
+        top_k: int = 4,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several queries concurrently; results are in input order.
+        Cached queries return without a network call and duplicates in
+        the batch share one search.
+        """
+        return await asyncio.gather(
+            *(self.query(q, scenario_id, step, top_k) for q in queries)
+        )
+
+    async def _lookup(
+        self,
+        key: tuple,
+        query_text: str,
+        top_k: int,
+        scope: tuple,
+    ) -> List[Dict[str, Any]]:
+        embedding = None
+        if self._semantic is not None:
+            try:
+                embedding = await self._embed(query_text)
+                cached = self._semantic.get(embedding, scope)
+            except Exception as e:
+                # The semantic tier is best-effort; fall through to search
+                logging.warning(f"Semantic cache lookup failed: {e}")
+                embedding, cached = None, None
+
+            if cached is not None:
+                self._cache.put(key, cached)
+                return cached
+
+        return await self._search(key, query_text, top_k, embedding, scope)
+
+    async def _embed(self, query_text: str) -> np.ndarray:
+        response = await self.client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=query_text,
+        )
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
+
+    async def _search(
+        self,
+        key: tuple,
+        query_text: str,
+        top_k: int,
+        embedding: Optional[np.ndarray],
+        scope: tuple,
+    ) -> List[Dict[str, Any]]:
+        page = await self.client.vector_stores.search(
+            vector_store_id=self.vector_store_id,
+            query=query_text,
+            filters=scenario_filter(scope[0]),
+            max_num_results=top_k,
+        )
+
+        chunks = [
+            {
+                "content": "\n".join(part.text for part in item.content),
+                "score": item.score,
+                "file_id": item.file_id,
+            }
+            for item in page.data
+        ]
+
+        self._cache.put(key, chunks)
+        if embedding is not None:
+            self._semantic.put(embedding, scope, chunks)
+        return chunks
 
     async def upload_file(self, scenario_id: str, file_path: str) -> str:
         """
@@ -35,9 +220,14 @@ class VectorClient:
 
         await self.client.vector_stores.files.create(
             vector_store_id=self.vector_store_id,
-            file_id=file_obj.id
+            file_id=file_obj.id,
+            # Search filters on this attribute (file metadata is not searchable)
+            attributes={"scenario_id": scenario_id},
         )
 
+        # Store contents changed; cached results may be stale
+        self._invalidate_caches()
+
         return file_obj.id
 
     async def delete_file(self, file_id: str):
@@ -48,3 +238,10 @@ class VectorClient:
             vector_store_id=self.vector_store_id,
             file_id=file_id
         )
+
+        self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        self._cache.invalidate()
+        if self._semantic is not None:
+            self._semantic.invalidate()
@@ -2,6 +2,7 @@ from pathlib import Path
 from openai import OpenAI
 
 from app.core.config import OPENAI_API_KEY, VECTOR_STORE_ID
+from app.rag.vector_client import SHARED_SCENARIO_ID
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
@@ -22,9 +23,11 @@ def upload_file_to_vector_store(file_path: Path):
     print(f"File uploaded. file_id={file_id}")
 
     # Step 2: Attach to vector store
+    # These are general guidelines, so every scenario's searches see them
     client.vector_stores.files.create(
         vector_store_id=VECTOR_STORE_ID,
-        file_id=file_id
+        file_id=file_id,
+        attributes={"scenario_id": SHARED_SCENARIO_ID}
     )
 
     print(f"Attached {file_path.name} to vector store.\n")
@@ -1,11 +1,18 @@
+import asyncio
+import hashlib
 from typing import Dict, List, Any, Optional
-from app.services.scenario_loader import load_scenario
-from app.rag.retriever import retrieve_with_rag
+from app.utils.query_cache import QueryCache
 from app.core.coordinator import Coordinator
+from app.core.state_machine import Step
 from app.services.session_manager import SessionManager
 from app.utils.mcq_evaluator import MCQEvaluator
 from app.utils.schema import EvaluatorResponse
 
+# Repeated (scenario, step, transcript) triples within a session reuse
+# the assembled agent context instead of re-running retrieval
+CONTEXT_CACHE_SIZE = 500
+CONTEXT_CACHE_TTL_SECONDS = 120
+
 
 class EvaluationService:
     def __init__(
@@ -16,6 +23,31 @@ class EvaluationService:
         self.coordinator = coordinator
         self.session_manager = session_manager
         self.mcq_evaluator = MCQEvaluator()
+        self._ctx_cache = QueryCache(
+            max_size=CONTEXT_CACHE_SIZE,
+            ttl_seconds=CONTEXT_CACHE_TTL_SECONDS,
+        )
+
+    def context_cache_stats(self) -> Dict[str, Any]:
+        return self._ctx_cache.stats()
+
+    # Firestore and the RAG client are imported on first use, so the
+    # service (and its tests) load without either being configured
+
+    async def _load_scenario(self, scenario_id: str) -> Dict[str, Any]:
+        from app.services.scenario_loader import load_scenario
+
+        # Firestore client is blocking; keep it off the event loop
+        return await asyncio.to_thread(load_scenario, scenario_id)
+
+    async def _retrieve_rag_text(self, transcript: str, scenario_id: str) -> str:
+        from app.rag.retriever import retrieve_with_rag
+
+        rag = await retrieve_with_rag(
+            query=transcript,
+            scenario_id=scenario_id
+        )
+        return rag["text"]
 
     async def prepare_agent_context(
         self,
@@ -24,19 +56,31 @@ class EvaluationService:
         step: str
     ) -> Dict[str, Any]:
 
-        scenario_metadata = load_scenario(scenario_id)
+        key = (
+            scenario_id,
+            step,
+            hashlib.blake2b(transcript.encode(), digest_size=16).digest(),
+        )
+        cached = self._ctx_cache.get(key)
+        if cached is not None:
+            # Shallow copy so callers cannot mutate the cached entry
+            return dict(cached)
 
-        rag = await retrieve_with_rag(
-            query=transcript,
-            scenario_id=scenario_id
+        # Firestore read and RAG call are independent; run them together
+        scenario_metadata, rag_text = await asyncio.gather(
+            self._load_scenario(scenario_id),
+            self._retrieve_rag_text(transcript, scenario_id),
         )
 
-        return {
+        context = {
             "transcript": transcript,
             "step": step,
             "scenario_metadata": scenario_metadata,
-            "rag_context": rag["text"]
+            "rag_context": rag_text
         }
+        self._ctx_cache.put(key, context)
+
+        return dict(context)
 
     async def aggregate_evaluations(
         self,
@@ -45,23 +89,24 @@ class EvaluationService:
         student_mcq_answers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
 
-        session = self.session_manager.get_session(session_id)
+        session = await self.session_manager.get_session(session_id)
         step = session["current_step"]
 
+        # Scoring tables are keyed by upper-case step name ("HISTORY", ...)
         coordinator_output = self.coordinator.aggregate(
             evaluations=evaluator_outputs,
-            current_step=step
+            current_step=step.name
         )
 
-        if step == "ASSESSMENT" and student_mcq_answers:
-            scenario_meta = load_scenario(session["scenario_id"])
+        if step is Step.ASSESSMENT and student_mcq_answers:
+            scenario_meta = await self._load_scenario(session["scenario_id"])
             mcq_result = self.mcq_evaluator.validate_mcq_answers(
                 student_mcq_answers,
                 scenario_meta.get("assessment_questions", {})
             )
             coordinator_output["mcq_result"] = mcq_result
 
-        self.session_manager.store_last_evaluation(
+        await self.session_manager.store_last_evaluation(
             session_id, coordinator_output
         )
 
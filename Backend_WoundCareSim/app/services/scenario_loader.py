@@ -1,24 +1,75 @@
+import threading
 from typing import Dict
-from app.services.scenario_service import get_scenario
+from app.utils.query_cache import QueryCache
 from app.utils.validators import validate_scenario_payload
 
+# Scenario metadata is immutable for a session's lifetime, so keep
+# recently loaded scenarios in memory instead of re-reading Firestore.
+SCENARIO_CACHE_SIZE = 256
+SCENARIO_CACHE_TTL_SECONDS = 300
+
+_cache = QueryCache(
+    max_size=SCENARIO_CACHE_SIZE,
+    ttl_seconds=SCENARIO_CACHE_TTL_SECONDS,
+)
+
+# Scenario ids hash onto a fixed set of locks, so concurrent cold loads of
+# the same id result in a single Firestore read without keeping a lock
+# per id ever requested
+LOAD_LOCK_STRIPES = 64
+
+_load_locks = tuple(threading.Lock() for _ in range(LOAD_LOCK_STRIPES))
+
+
+def _lock_for(scenario_id: str) -> threading.Lock:
+    return _load_locks[hash(scenario_id) % LOAD_LOCK_STRIPES]
+
+
+def get_scenario(scenario_id: str) -> Dict:
+    # Firestore is imported on first use, so the cache loads without it
+    from app.services.scenario_service import get_scenario as read_scenario
+
+    return read_scenario(scenario_id)
+
 
 def load_scenario(scenario_id: str) -> Dict:
     """
     Load and validate scenario for session usage.
     """
-    scenario = get_scenario(scenario_id)
-
-    # Validate structure
-    validate_scenario_payload(scenario)
-
-    return {
-        "scenario_id": scenario["scenario_id"],
-        "title": scenario["scenario_title"],
-        "patient_history": scenario["patient_history"],
-        "wound_details": scenario["wound_details"],
-        "conversation_points": scenario.get("required_conversation_points", []),
-        "assessment_questions": scenario["assessment_questions"],
-        "evaluation_criteria": scenario["evaluation_criteria"],
-        "vector_namespace": scenario["vector_store_namespace"]
-    }
+    # Shallow copies so callers cannot mutate the cached entry
+    cached = _cache.get(scenario_id)
+    if cached is not None:
+        return dict(cached)
+
+    with _lock_for(scenario_id):
+        # Another thread may have loaded it while we waited
+        cached = _cache.get(scenario_id)
+        if cached is not None:
+            return dict(cached)
+
+        scenario = get_scenario(scenario_id)
+
+        # Validate structure
+        validate_scenario_payload(scenario)
+
+        result = {
+            "scenario_id": scenario["scenario_id"],
+            "title": scenario["scenario_title"],
+            "patient_history": scenario["patient_history"],
+            "wound_details": scenario["wound_details"],
+            "conversation_points": scenario.get("required_conversation_points", []),
+            "assessment_questions": scenario["assessment_questions"],
+            "evaluation_criteria": scenario["evaluation_criteria"],
+            "vector_namespace": scenario["vector_store_namespace"]
+        }
+
+        _cache.put(scenario_id, result)
+
+    return dict(result)
+
+
+def invalidate(scenario_id: str) -> None:
+    """
+    Drop a cached scenario after it is edited or deleted.
+    """
+    _cache.invalidate(scenario_id)
@@ -13,7 +13,7 @@ COLLECTION = "scenarios"
 
 
 def create_scenario(data: Dict):
-    validate_scenario_payload(data)
+    validate_scenario_payload(data, fail_fast=False)
     data["created_at"] = datetime.utcnow().isoformat()
     set_document(COLLECTION, data["scenario_id"], data)
     return data
@@ -1,24 +1,33 @@
-from app.core.state_machine import Step, next_step
-from typing import Optional, Dict, Any, List
+from app.core.state_machine import Step
+from app.services.session_store import create_session_store
+from typing import Optional, Dict, Any
 from datetime import datetime
 
 
 class SessionManager:
-    def __init__(self):
-        self.sessions = {}
+    """
+    Session lifecycle on top of a session store.
 
-    def create_session(
+    All methods are async so the Redis backend never blocks the event
+    loop. Updates write only the fields they change, and step
+    transitions are atomic in the store.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or create_session_store()
+
+    async def create_session(
         self,
         scenario_id: str,
         student_id: str,
         scenario_metadata: Optional[Dict[str, Any]] = None
     ) -> str:
-        session_id = f"sess_{len(self.sessions)+1}_{int(datetime.now().timestamp())}"
+        session_id = f"sess_{await self.store.next_id()}_{int(datetime.now().timestamp())}"
 
-        self.sessions[session_id] = {
+        await self.store.set(session_id, {
             "scenario_id": scenario_id,
             "student_id": student_id,
-            "current_step": Step.HISTORY.value,
+            "current_step": Step.HISTORY,
             "attempt_count": {},
             "last_evaluation": None,
             "locked_step": False,
@@ -27,45 +36,38 @@ class SessionManager:
             "rag_results": [],
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat(),
-        }
+        })
         return session_id
 
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        return self.sessions.get(session_id)
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(session_id)
 
-    def store_last_evaluation(self, session_id: str, evaluation: Dict[str, Any]) -> None:
-        session = self.sessions.get(session_id)
-        if session:
-            session["last_evaluation"] = evaluation
-            session["updated_at"] = datetime.now().isoformat()
+    async def add_log(self, session_id: str, entry: Dict[str, Any]) -> None:
+        await self.store.append_event(session_id, "logs", entry)
 
-    def increment_attempt(self, session_id: str) -> None:
-        session = self.sessions.get(session_id)
-        if not session:
-            return
-        step = session["current_step"]
-        session["attempt_count"][step] = session["attempt_count"].get(step, 0) + 1
+    async def add_rag_result(self, session_id: str, entry: Dict[str, Any]) -> None:
+        await self.store.append_event(session_id, "rag_results", entry)
 
-    def reset_attempts(self, session_id: str) -> None:
-        session = self.sessions.get(session_id)
-        if session:
-            session["attempt_count"][session["current_step"]] = 0
+    async def store_last_evaluation(self, session_id: str, evaluation: Dict[str, Any]) -> None:
+        await self.store.update(session_id, {
+            "last_evaluation": evaluation,
+            "updated_at": datetime.now().isoformat(),
+        })
 
-    def lock_current_step(self, session_id: str) -> None:
-        session = self.sessions.get(session_id)
+    async def increment_attempt(self, session_id: str) -> None:
+        session = await self.store.get(session_id)
         if session:
-            session["locked_step"] = True
-
-    def advance_step(self, session_id: str) -> Optional[str]:
-        session = self.sessions.get(session_id)
-        if not session or session["locked_step"]:
-            return None
+            await self.store.incr_attempt(session_id, session["current_step"].label)
 
-        current_step = Step(session["current_step"])
-        new_step = next_step(current_step)
+    async def reset_attempts(self, session_id: str) -> None:
+        session = await self.store.get(session_id)
+        if session:
+            await self.store.reset_attempt(session_id, session["current_step"].label)
 
-        session["current_step"] = new_step.value
-        session["locked_step"] = False
-        session["updated_at"] = datetime.now().isoformat()
+    async def lock_current_step(self, session_id: str) -> None:
+        await self.store.update(session_id, {"locked_step": True})
 
-        return new_step.value
+    async def advance_step(self, session_id: str) -> Optional[Step]:
+        # Read-modify-write of current_step happens inside the store, so
+        # concurrent requests cannot both advance from the same step
+        return await self.store.advance_step(session_id)
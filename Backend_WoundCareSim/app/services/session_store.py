@@ -0,0 +1,288 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+
+import orjson
+
+from app.core.config import REDIS_URL
+from app.core.state_machine import Step, next_step
+
+# Session fields that are append-only event lists
+EVENT_FIELDS = ("logs", "rag_results")
+
+# How many recent events per field are kept on the session dict
+RECENT_EVENTS = 10
+
+# In-memory bounds: least recently used sessions are dropped past
+# MAX_SESSIONS, and idle sessions expire after SESSION_TTL_SECONDS
+MAX_SESSIONS = 10_000
+SESSION_TTL_SECONDS = 4 * 60 * 60
+
+
+class InMemorySessionStore:
+    """
+    Process-local session storage.
+    Used for tests and single-worker development.
+
+    Methods are async to match RedisSessionStore, but never await while
+    holding session state, so each call is atomic on the event loop.
+    The lock additionally makes the store safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        max_events: int = RECENT_EVENTS,
+        max_sessions: int = MAX_SESSIONS,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+    ):
+        # session_id -> (last access time, session), oldest first
+        self._sessions: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._max_events = max_events
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # Monotonic, so ids never repeat even if sessions are removed
+        self._counter = itertools.count(1)
+
+    async def next_id(self) -> int:
+        return next(self._counter)
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        # Caller holds the lock
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        now = time.monotonic()
+        if now - entry[0] >= self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+
+        self._sessions[session_id] = (now, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._touch(session_id)
+
+    async def set(self, session_id: str, session: Dict[str, Any]) -> None:
+        # Event lists are bounded so long sessions keep a flat footprint.
+        # They stay plain lists, the same shape RedisSessionStore returns.
+        for field in EVENT_FIELDS:
+            events = session.get(field)
+            if isinstance(events, list):
+                session[field] = events[-self._max_events:]
+
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    async def update(self, session_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session:
+                session.update(fields)
+
+    async def append_event(self, session_id: str, field: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session:
+                events = session[field]
+                events.append(event)
+                if len(events) > self._max_events:
+                    del events[0]
+
+    async def incr_attempt(self, session_id: str, step: str) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session:
+                attempts = session["attempt_count"]
+                attempts[step] = attempts.get(step, 0) + 1
+
+    async def reset_attempt(self, session_id: str, step: str) -> None:
+        with self._lock:
+            session = self._touch(session_id)
+            if session:
+                session["attempt_count"][step] = 0
+
+    async def advance_step(self, session_id: str) -> Optional[Step]:
+        """
+        Move to the next step unless the session is missing or locked.
+        Raises ValueError when the session is already COMPLETED.
+        """
+        with self._lock:
+            session = self._touch(session_id)
+            if not session or session["locked_step"]:
+                return None
+
+            new_step = next_step(session["current_step"])
+            session.update({
+                "current_step": new_step,
+                "locked_step": False,
+                "updated_at": datetime.now().isoformat(),
+            })
+            return new_step
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session storage shared across uvicorn workers.
+
+    Layout:
+      sess:{id}            hash, one JSON-encoded value per session field
+      sess:{id}:attempts   hash, attempt counter per step label
+      sess:{id}:{field}    list, one JSON-encoded entry per event
+      sess:counter         integer used for session ids
+
+    The full event history stays in Redis; get() only loads the most
+    recent max_events entries of each list. Writes touch only the
+    fields they change, and the step transition runs as a WATCH/MULTI
+    transaction, so concurrent workers cannot undo each other's updates.
+    Every write renews a TTL on all of the session's keys, so idle
+    sessions expire as they do in memory.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_events: int = RECENT_EVENTS,
+        client=None,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+    ):
+        if client is None:
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(url)
+
+        self._redis = client
+        self._max_events = max_events
+        self.ttl_seconds = int(ttl_seconds)
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"sess:{session_id}"
+
+    def _expire(self, pipe, key: str) -> None:
+        # Queue a TTL renewal for the session hash and its side keys
+        for suffix in ("", ":attempts", *(f":{field}" for field in EVENT_FIELDS)):
+            pipe.expire(f"{key}{suffix}", self.ttl_seconds)
+
+    async def next_id(self) -> int:
+        return await self._redis.incr("sess:counter")
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        key = self._key(session_id)
+
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.hgetall(key)
+        pipe.hgetall(f"{key}:attempts")
+        for field in EVENT_FIELDS:
+            pipe.lrange(f"{key}:{field}", -self._max_events, -1)
+        raw, attempts, *events = await pipe.execute()
+
+        if not raw:
+            return None
+
+        session = {k.decode(): orjson.loads(v) for k, v in raw.items()}
+        # Step is stored as its ordinal; restore the enum member at the boundary
+        session["current_step"] = Step(session["current_step"])
+        session["attempt_count"] = {k.decode(): int(v) for k, v in attempts.items()}
+        for field, items in zip(EVENT_FIELDS, events):
+            session[field] = [orjson.loads(item) for item in items]
+
+        return session
+
+    async def set(self, session_id: str, session: Dict[str, Any]) -> None:
+        key = self._key(session_id)
+        mapping = {
+            k: orjson.dumps(v)
+            for k, v in session.items()
+            if k not in EVENT_FIELDS and k != "attempt_count"
+        }
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        if session.get("attempt_count"):
+            pipe.hset(f"{key}:attempts", mapping=session["attempt_count"])
+        self._expire(pipe, key)
+        await pipe.execute()
+
+    async def update(self, session_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(session_id)
+        if not await self._redis.exists(key):
+            return
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={k: orjson.dumps(v) for k, v in fields.items()})
+        self._expire(pipe, key)
+        await pipe.execute()
+
+    async def append_event(self, session_id: str, field: str, event: Dict[str, Any]) -> None:
+        key = self._key(session_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.rpush(f"{key}:{field}", orjson.dumps(event))
+        self._expire(pipe, key)
+        await pipe.execute()
+
+    async def incr_attempt(self, session_id: str, step: str) -> None:
+        key = self._key(session_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hincrby(f"{key}:attempts", step, 1)
+        self._expire(pipe, key)
+        await pipe.execute()
+
+    async def reset_attempt(self, session_id: str, step: str) -> None:
+        key = self._key(session_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(f"{key}:attempts", step, 0)
+        self._expire(pipe, key)
+        await pipe.execute()
+
+    async def advance_step(self, session_id: str) -> Optional[Step]:
+        """
+        Move to the next step unless the session is missing or locked.
+        Raises ValueError when the session is already COMPLETED.
+        """
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw_step, raw_locked = await pipe.hmget(
+                        key, "current_step", "locked_step"
+                    )
+                    if raw_step is None or orjson.loads(raw_locked):
+                        return None
+
+                    new_step = next_step(Step(orjson.loads(raw_step)))
+
+                    pipe.multi()
+                    pipe.hset(key, mapping={
+                        "current_step": orjson.dumps(new_step),
+                        "locked_step": orjson.dumps(False),
+                        "updated_at": orjson.dumps(datetime.now().isoformat()),
+                    })
+                    self._expire(pipe, key)
+                    await pipe.execute()
+                    return new_step
+                except WatchError:
+                    # Another worker changed the session; re-read and retry
+                    continue
+
+
+def create_session_store():
+    """
+    Pick the session backend from config: Redis when REDIS_URL is set,
+    otherwise an in-memory dict.
+    """
+    if REDIS_URL:
+        return RedisSessionStore(REDIS_URL)
+    return InMemorySessionStore()
@@ -0,0 +1,67 @@
+"""
+Numeric kernels for evaluator score aggregation.
+
+Compiled with Numba when it is installed and enabled; otherwise the
+vectorised NumPy version is used (a Python loop over ndarray elements
+would be far slower than either). Numba is imported and the kernel
+compiled on the first call, so importing this module stays cheap.
+"""
+
+
+def _agg(scores, confidences, weights):
+    """
+    Weighted reduction over per-agent arrays.
+
+    Returns (composite_score, weighted_confidence).
+    """
+    total = 0.0
+    weight_sum = 0.0
+    conf = 0.0
+
+    for i in range(scores.shape[0]):
+        w = weights[i]
+        total += scores[i] * w
+        conf += confidences[i] * w
+        weight_sum += w
+
+    if weight_sum == 0.0:
+        return total, 0.0
+
+    return total, conf / weight_sum
+
+
+def _agg_numpy(scores, confidences, weights):
+    """
+    Same reduction as _agg, as two dot products.
+    """
+    weight_sum = weights.sum()
+    total = scores @ weights
+
+    if weight_sum == 0.0:
+        return total, 0.0
+
+    return total, (confidences @ weights) / weight_sum
+
+
+def _build_kernel():
+    try:
+        import numba
+    except ImportError:  # numba is optional
+        return _agg_numpy
+
+    if numba.config.DISABLE_JIT:
+        return _agg_numpy
+    return numba.njit(cache=True, fastmath=True)(_agg)
+
+
+_kernel = None
+
+
+def agg(scores, confidences, weights):
+    """
+    Weighted reduction via the best available kernel, built on first use.
+    """
+    global _kernel
+    if _kernel is None:
+        _kernel = _build_kernel()
+    return _kernel(scores, confidences, weights)
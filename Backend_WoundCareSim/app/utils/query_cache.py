@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+    Tracks hits, misses and evictions for monitoring.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one key, or everything when no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SemanticCache:
+    """
+    Similarity-aware cache keyed on query embeddings.
+
+    A lookup returns the value of the most similar stored embedding in
+    the same scope if its cosine similarity reaches the threshold, so
+    paraphrased queries can share one result. Embeddings are kept
+    L2-normalised in one contiguous float32 matrix, so a lookup is a
+    single matrix-vector product. When full, the oldest entry is
+    overwritten.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        threshold: float = 0.95,
+        ttl_seconds: float = 300,
+    ):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+
+        # Allocated on first put, once the embedding size is known
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes = np.full(max_size, -1, dtype=np.int64)
+        self._stored_at = np.zeros(max_size, dtype=np.float64)
+        self._values: List[Any] = [None] * max_size
+        self._scope_ids: Dict[Hashable, int] = {}
+        self._size = 0
+        self._next = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalise(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, embedding, scope: Hashable) -> Optional[Any]:
+        """
+        Return the closest cached value in scope, or None below threshold.
+        """
+        with self._lock:
+            scope_id = self._scope_ids.get(scope)
+            if scope_id is None or self._vectors is None:
+                self.misses += 1
+                return None
+
+            n = self._size
+            sims = self._vectors[:n] @ self._normalise(embedding)
+
+            now = time.monotonic()
+            valid = (self._scopes[:n] == scope_id) & (
+                now - self._stored_at[:n] < self.ttl_seconds
+            )
+            sims[~valid] = -np.inf
+
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return self._values[best]
+
+    def put(self, embedding, scope: Hashable, value: Any) -> None:
+        vec = self._normalise(embedding)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vec.shape[0]), dtype=np.float32)
+
+            slot = self._next
+            self._vectors[slot] = vec
+            self._scopes[slot] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            self._stored_at[slot] = time.monotonic()
+            self._values[slot] = value
+
+            self._next = (slot + 1) % self.max_size
+            self._size = min(self._size + 1, self.max_size)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._scopes[:] = -1
+            self._values = [None] * self.max_size
+            self._scope_ids.clear()
+            self._size = 0
+            self._next = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
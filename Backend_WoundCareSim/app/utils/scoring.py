@@ -1,5 +1,9 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+import numpy as np
+
 from app.utils.schema import EvaluatorResponse
+from app.utils._kernels import agg
 
 
 # ---- Verdict → Base score mapping ----
@@ -62,20 +66,51 @@ def aggregate_scores(
     weights = STEP_WEIGHTS.get(current_step, {})
     agent_scores = {}
     composite_score = 0.0
+    weighted_confidence = 0.0
+    weight_sum = 0.0
 
+    # A request carries a handful of evaluators, where one Python pass
+    # beats building arrays
     for ev in evaluations:
         score = score_single_evaluation(ev)
         agent_scores[ev.agent_name] = score
 
         weight = weights.get(ev.agent_name, 0.0)
         composite_score += score * weight
+        weighted_confidence += ev.confidence * weight
+        weight_sum += weight
+
+    if weight_sum:
+        weighted_confidence /= weight_sum
 
     return {
         "agent_scores": agent_scores,
         "composite_score": round(composite_score, 3),
+        "weighted_confidence": round(weighted_confidence, 3),
     }
 
 
+def aggregate_arrays(
+    scores: np.ndarray,
+    confidences: np.ndarray,
+    step_weights: np.ndarray,
+) -> Tuple[float, float]:
+    """
+    Weighted reduction over pre-split per-agent arrays.
+
+    Returns (composite_score, weighted_confidence). Kept at float64 so
+    results match the per-evaluator Python sum. For offline scoring of
+    large evaluation batches; no request path uses it, since
+    aggregate_scores is faster for a request's few evaluators.
+    """
+    composite_score, weighted_confidence = agg(
+        np.ascontiguousarray(scores, dtype=np.float64),
+        np.ascontiguousarray(confidences, dtype=np.float64),
+        np.ascontiguousarray(step_weights, dtype=np.float64),
+    )
+    return float(composite_score), float(weighted_confidence)
+
+
 def check_readiness(
     evaluations: List[EvaluatorResponse],
     current_step: str,
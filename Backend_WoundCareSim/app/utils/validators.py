@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator
 
 # -------------------------------
 # Scenario Validation (Week-3)
@@ -15,47 +15,87 @@ REQUIRED_SCENARIO_FIELDS = [
 ]
 
 
-def validate_scenario_payload(data: Dict[str, Any]) -> None:
+def validate_scenario_payload(data: Dict[str, Any], fail_fast: bool = True) -> None:
     """
     Validates scenario metadata before storing or loading.
+
+    fail_fast=True stops at the first problem (no MCQ checks run once a
+    cheaper check has failed). fail_fast=False collects every problem into
+    one error, for the admin create flow.
     """
+    if fail_fast:
+        error = next(_iter_scenario_errors(data), None)
+        if error:
+            raise ValueError(error)
+        return
+
+    errors = list(_iter_scenario_errors(data))
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
+def _iter_scenario_errors(data: Dict[str, Any]) -> Iterator[str]:
     missing = [f for f in REQUIRED_SCENARIO_FIELDS if f not in data]
     if missing:
-        raise ValueError(f"Missing required fields: {missing}")
+        yield f"Missing required fields: {missing}"
+        return
 
-    if not isinstance(data["assessment_questions"], list):
-        raise ValueError("assessment_questions must be a list")
+    # Look each field up once; all are known to be present here
+    questions = data["assessment_questions"]
+    criteria = data["evaluation_criteria"]
 
-    validate_mcq_list(data["assessment_questions"])
+    if not isinstance(questions, list):
+        yield "assessment_questions must be a list"
+    else:
+        yield from _iter_mcq_list_errors(questions)
 
-    if not isinstance(data["evaluation_criteria"], dict):
-        raise ValueError("evaluation_criteria must be a dictionary")
+    if not isinstance(criteria, dict):
+        yield "evaluation_criteria must be a dictionary"
 
 
 # -------------------------------
 # MCQ Validation
 # -------------------------------
 
+REQUIRED_MCQ_FIELDS = ["question", "options", "correct_answer"]
+
+
 def validate_mcq_list(mcqs: List[Dict[str, Any]]) -> None:
+    error = next(_iter_mcq_list_errors(mcqs), None)
+    if error:
+        raise ValueError(error)
+
+
+def validate_mcq(mcq: Dict[str, Any], index: int) -> None:
+    error = next(_iter_mcq_errors(mcq, index), None)
+    if error:
+        raise ValueError(error)
+
+
+def _iter_mcq_list_errors(mcqs: List[Dict[str, Any]]) -> Iterator[str]:
     if not mcqs:
-        raise ValueError("assessment_questions cannot be empty")
+        yield "assessment_questions cannot be empty"
+        return
 
     for i, mcq in enumerate(mcqs):
-        validate_mcq(mcq, i)
+        yield from _iter_mcq_errors(mcq, i)
 
 
-def validate_mcq(mcq: Dict[str, Any], index: int) -> None:
-    required = ["question", "options", "correct_answer"]
-
-    for field in required:
+def _iter_mcq_errors(mcq: Dict[str, Any], index: int) -> Iterator[str]:
+    for field in REQUIRED_MCQ_FIELDS:
         if field not in mcq:
-            raise ValueError(f"MCQ {index+1} missing '{field}'")
+            yield f"MCQ {index+1} missing '{field}'"
+            return
+
+    question = mcq["question"]
+    options = mcq["options"]
+    correct_answer = mcq["correct_answer"]
 
-    if not isinstance(mcq["options"], list) or len(mcq["options"]) < 2:
-        raise ValueError(f"MCQ {index+1} must have at least 2 options")
+    if not isinstance(options, list) or len(options) < 2:
+        yield f"MCQ {index+1} must have at least 2 options"
 
-    if not mcq["question"].strip():
-        raise ValueError(f"MCQ {index+1} question cannot be empty")
+    if not question.strip():
+        yield f"MCQ {index+1} question cannot be empty"
 
-    if not mcq["correct_answer"].strip():
-        raise ValueError(f"MCQ {index+1} correct_answer cannot be empty")
+    if not correct_answer.strip():
+        yield f"MCQ {index+1} correct_answer cannot be empty"
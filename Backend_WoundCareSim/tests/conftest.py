@@ -0,0 +1,6 @@
+import os
+
+# Numba compiles the aggregation kernel on first use, which costs more than
+# the tiny test payloads themselves. Must be set before any app import.
+# Run with NUMBA_DISABLE_JIT=0 to exercise the compiled path instead.
+os.environ.setdefault("NUMBA_DISABLE_JIT", "1")
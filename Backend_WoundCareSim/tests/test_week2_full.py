@@ -1,38 +1,211 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 
-# Our app
-from app.main import app
-
-# Core modules
+# Lightweight core modules. The app, agents and RAG stack are imported
+# inside the fixtures that need them, so pure unit tests never load
+# OpenAI or Firebase clients.
 from app.core.state_machine import Step, next_step, validate_action
-from app.core.coordinator import coordinate
+from app.core.coordinator import Coordinator
+from app.utils.scoring import aggregate_arrays
+from app.utils.query_cache import QueryCache, SemanticCache
+from app.services.session_manager import SessionManager
 
-# Agents
-from app.agents.communication_agent import CommunicationAgent
-from app.agents.knowledge_agent import KnowledgeAgent
-from app.agents.clinical_agent import ClinicalAgent
+_DATA_DIR = Path(__file__).resolve().parent.parent / "app" / "data"
 
-# RAG + services
-from app.rag.vector_client import VectorClient
-from app.rag.retriever import Retriever
-from app.services.scenario_loader import ScenarioLoader
-from app.services.session_manager import SessionManager
-from app.services.evaluation_service import EvaluationService
+# API request bodies, serialized once at import
+_JSON_HEADERS = {"content-type": "application/json"}
 
+_START_JSON = orjson.dumps({
+    "scenario_id": "scenario_1",
+    "student_id": "stu_1"
+})
+
+# Valid EvaluatorResponse bodies, as the VR client sends them
+_EVALUATOR_OUTPUTS_JSON = orjson.dumps([
+    {
+        "agent_name": "CommunicationAgent",
+        "step": "history",
+        "strengths": ["introduced self"],
+        "issues_detected": [],
+        "explanation": "ok",
+        "verdict": "Appropriate",
+        "confidence": 0.8,
+    },
+    {
+        "agent_name": "KnowledgeAgent",
+        "step": "history",
+        "strengths": [],
+        "issues_detected": ["missed allergies"],
+        "explanation": "fine",
+        "verdict": "Partially Appropriate",
+        "confidence": 0.7,
+    },
+])
+
+
+def _history_step_json(session_id: str) -> bytes:
+    # Only the session id varies; splice it into the pre-serialized body
+    return (
+        b'{"session_id":' + orjson.dumps(session_id)
+        + b',"step":"history","evaluator_outputs":'
+        + _EVALUATOR_OUTPUTS_JSON + b"}"
+    )
+
+
+@pytest.fixture(scope="session")
+def fastapi_app():
+    # The routes import the Firestore client; skipped where
+    # firebase_admin isn't installed
+    pytest.importorskip("firebase_admin")
+    from app.main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+async def async_client(fastapi_app):
+    # ASGITransport does not run the lifespan, so enter it explicitly;
+    # being session-scoped, it runs once for every API test
+    async with fastapi_app.router.lifespan_context(fastapi_app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=fastapi_app),
+            base_url="http://test",
+        ) as c:
+            yield c
+
+
+# Built once per run and shared by every RAG / service test
+@pytest.fixture(scope="session")
+def vector_client():
+    from app.rag.vector_client import VectorClient
+    return VectorClient()
+
+
+@pytest.fixture(scope="session")
+async def retriever(vector_client):
+    from app.rag.retriever import Retriever
+    retriever = Retriever(vector_client=vector_client)
+    # One warmup query opens the pooled connection, so the first RAG
+    # test is not timed on a cold client
+    await retriever.get_context("warmup", "scenario_1", "history")
+    return retriever
+
+
+@pytest.fixture(scope="session")
+def scenario_loader():
+    # Reads live Firestore; skipped where firebase_admin isn't installed
+    pytest.importorskip("firebase_admin")
+    from app.services.scenario_loader import load_scenario
+    return load_scenario
+
+
+# Function scope: each test (and each xdist worker) gets a fresh store
+@pytest.fixture
+def session_manager():
+    return SessionManager()
+
+
+class FakeOpenAI:
+    """
+    Stands in for AsyncOpenAI in RAG tests: counts embedding and search
+    calls and yields to the loop so concurrent calls can overlap.
+    """
+
+    def __init__(self, embeddings=None, embed_error=None):
+        self.search_calls = []
+        self.search_filters = []
+        self.embed_calls = []
+        self._embeddings = embeddings or {}
+        self._embed_error = embed_error
+        self.vector_stores = SimpleNamespace(search=self._search)
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    async def _search(self, vector_store_id, query, max_num_results, filters=None):
+        self.search_calls.append(query)
+        self.search_filters.append(filters)
+        await asyncio.sleep(0)
+        item = SimpleNamespace(
+            content=[SimpleNamespace(text=f"chunk for {query}")],
+            score=1.0,
+            file_id="file_1",
+        )
+        return SimpleNamespace(data=[item])
+
+    async def _embed(self, model, input):
+        self.embed_calls.append(input)
+        await asyncio.sleep(0)
+        if self._embed_error:
+            raise self._embed_error
+        vector = self._embeddings.get(input, [1.0, 0.0, 0.0])
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vector)])
+
+
+@pytest.fixture
+def make_vector_client(monkeypatch):
+    monkeypatch.setattr("app.rag.vector_client.OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr("app.rag.vector_client.VECTOR_STORE_ID", "vs_test")
+    monkeypatch.setattr("app.rag.vector_client.EMBEDDING_MODEL", "test-embed")
+
+    def make(fake, semantic_cache_enabled=False):
+        from app.rag.vector_client import VectorClient
+        return VectorClient(
+            openai_client=fake,
+            semantic_cache_enabled=semantic_cache_enabled,
+        )
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def evaluation_service(scenario_loader):
+    # Depends on scenario_loader: prepare_agent_context loads scenarios
+    # from Firestore, so the service is skipped along with it
+    from app.services.evaluation_service import EvaluationService
+    return EvaluationService(coordinator=Coordinator(), session_manager=SessionManager())
+
+
+# Agents share the app-wide HTTP pool, which the app closes on shutdown
+@pytest.fixture(scope="session")
+def communication_agent():
+    from app.agents.communication_agent import CommunicationAgent
+    return CommunicationAgent()
+
+
+@pytest.fixture(scope="session")
+def knowledge_agent():
+    from app.agents.knowledge_agent import KnowledgeAgent
+    return KnowledgeAgent()
+
+
+@pytest.fixture(scope="session")
+def clinical_agent():
+    from app.agents.clinical_agent import ClinicalAgent
+    return ClinicalAgent()
 
-client = TestClient(app)
 
 # ---------------------------------------------------------
 # 1. STATE MACHINE TESTS
 # ---------------------------------------------------------
 
-def test_state_machine_forward_transitions():
-    assert next_step(Step.HISTORY) == Step.ASSESSMENT
-    assert next_step(Step.ASSESSMENT) == Step.CLEANING
-    assert next_step(Step.CLEANING) == Step.DRESSING
-    assert next_step(Step.DRESSING) == Step.COMPLETED
+@pytest.mark.parametrize("current, expected", [
+    (Step.HISTORY, Step.ASSESSMENT),
+    (Step.ASSESSMENT, Step.CLEANING),
+    (Step.CLEANING, Step.DRESSING),
+    (Step.DRESSING, Step.COMPLETED),
+])
+def test_state_machine_forward_transitions(current, expected):
+    assert next_step(current) == expected
 
+
+def test_state_machine_completed_is_terminal():
     with pytest.raises(ValueError):
         next_step(Step.COMPLETED)
 
@@ -41,6 +214,9 @@ def test_validate_action():
     assert validate_action(Step.HISTORY, "voice_transcript")
     assert validate_action(Step.ASSESSMENT, "mcq_answer")
     assert not validate_action(Step.HISTORY, "visual_assessment")
+    # Unknown steps are rejected rather than raising
+    assert not validate_action("history", "voice_transcript")
+    assert not validate_action(99, "voice_transcript")
 
 
 # ---------------------------------------------------------
@@ -48,121 +224,511 @@ def test_validate_action():
 # ---------------------------------------------------------
 
 def test_coordinator_aggregation():
+    from app.utils.schema import EvaluatorResponse
+
     sample = [
-        {"agent": "communication", "confidence": 0.8, "score": 0.7, "rationale": "ok"},
-        {"agent": "clinical", "confidence": 0.9, "score": 0.9, "rationale": "great"}
+        EvaluatorResponse(
+            agent_name="CommunicationAgent", step="HISTORY",
+            strengths=["greeted patient"], issues_detected=[],
+            explanation="ok", verdict="Appropriate", confidence=0.8,
+        ),
+        EvaluatorResponse(
+            agent_name="ClinicalAgent", step="HISTORY",
+            strengths=[], issues_detected=["no hand hygiene"],
+            explanation="great", verdict="Appropriate", confidence=0.9,
+        ),
     ]
-    result = coordinate(sample)
+    result = Coordinator().aggregate(sample, current_step="HISTORY")
 
-    assert "final_score" in result
-    assert result["final_score"] == pytest.approx((0.7 + 0.9) / 2, rel=1e-3)
-    assert "final_feedback" in result
-    assert "actions" in result
-    assert "confidences" in result
+    # HISTORY weights: communication 0.5, clinical 0.1
+    assert result["scores"]["composite_score"] == pytest.approx(0.8 * 0.5 + 0.9 * 0.1)
+    assert set(result["agent_feedback"]) == {"CommunicationAgent", "ClinicalAgent"}
+    assert result["summary"]["strengths"] == ["[CommunicationAgent] greeted patient"]
+    assert result["summary"]["issues_detected"] == ["[ClinicalAgent] no hand hygiene"]
+    assert result["decision"]["ready_for_next_step"] is False
+
+
+@pytest.mark.parametrize("n_agents", [2, 1000])
+def test_aggregate_arrays_matches_python(n_agents):
+    rng = np.random.default_rng(n_agents)
+    scores = rng.random(n_agents)
+    confidences = rng.random(n_agents)
+    weights = rng.random(n_agents)
+
+    composite, confidence = aggregate_arrays(scores, confidences, weights)
+
+    expected_composite = sum(s * w for s, w in zip(scores, weights))
+    expected_confidence = sum(c * w for c, w in zip(confidences, weights)) / sum(weights)
+    assert composite == pytest.approx(expected_composite, rel=1e-9)
+    assert confidence == pytest.approx(expected_confidence, rel=1e-9)
 
 
 # ---------------------------------------------------------
 # 3. AGENT EVALUATION TESTS
 # ---------------------------------------------------------
 
-@pytest.mark.asyncio
-async def test_communication_agent():
-    agent = CommunicationAgent()
-    out = await agent.evaluate({
-        "step": "history",
-        "transcript": "Hello I am here to assess you, may I check the wound? Thank you.",
-        "actions": []
-    })
+@pytest.fixture
+def canned_llm(monkeypatch):
+    """
+    Replaces the LLM call with a fixed evaluator response and records
+    the prompts each agent sent.
+    """
+    from app.agents.agent_base import BaseAgent
+
+    prompts = []
+    response = orjson.dumps({
+        "agent_name": "ignored",
+        "step": "ignored",
+        "strengths": ["canned strength"],
+        "issues_detected": [],
+        "explanation": "canned explanation",
+        "verdict": "Appropriate",
+        "confidence": 0.9,
+    }).decode()
+
+    async def fake_run(self, system_prompt, user_prompt, temperature=0.2):
+        prompts.append(user_prompt)
+        return response
+
+    monkeypatch.setattr(BaseAgent, "run", fake_run)
+    return prompts
+
+
+SCENARIO_METADATA = {
+    "patient_history": "Minor forearm surgery two days ago.",
+    "wound_details": "Clean incision, sutures intact.",
+}
+
+
+async def test_all_agents_concurrent(
+    monkeypatch, canned_llm, communication_agent, knowledge_agent, clinical_agent
+):
+    from app.agents.agent_base import BaseAgent
+
+    canned_run = BaseAgent.run
+    started = 0
+    all_started = asyncio.Event()
+
+    async def gated_run(self, *args, **kwargs):
+        nonlocal started
+        started += 1
+        if started == 3:
+            all_started.set()
+        # Only returns once all three calls are in flight at the same time
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        return await canned_run(self, *args, **kwargs)
+
+    monkeypatch.setattr(BaseAgent, "run", gated_run)
+
+    # Primary agent path: all three evaluators run at once, as in a real step
+    kwargs = {
+        "current_step": "HISTORY",
+        "student_input": "Hello, I am your nurse. May I check your wound? Any allergies?",
+        "scenario_metadata": SCENARIO_METADATA,
+        "rag_response": "Confirm identity and consent before wound care.",
+    }
+
+    comm, know, clin = await asyncio.gather(
+        communication_agent.evaluate(**kwargs),
+        knowledge_agent.evaluate(**kwargs),
+        clinical_agent.evaluate(**kwargs),
+    )
 
-    assert out.agent == "communication"
-    assert 0 <= out.score <= 1
-    assert out.confidence >= 0
-    assert isinstance(out.suggested_actions, list)
+    expected_names = ("CommunicationAgent", "KnowledgeAgent", "ClinicalAgent")
+    for out, name in zip((comm, know, clin), expected_names):
+        # Parsed from the canned response, with name and step enforced
+        assert out.agent_name == name
+        assert out.step == "HISTORY"
+        assert out.verdict == "Appropriate"
+        assert out.confidence == pytest.approx(0.9)
+        assert out.strengths == ["canned strength"]
+    assert len(canned_llm) == 3
+
+
+async def test_communication_agent(communication_agent, canned_llm):
+    out = await communication_agent.evaluate(
+        current_step="HISTORY",
+        student_input="Hello I am here to assess you, may I check the wound? Thank you.",
+        scenario_metadata=SCENARIO_METADATA,
+        rag_response="Introduce yourself and ask for consent.",
+    )
 
+    assert out.agent_name == "CommunicationAgent"
+    assert out.verdict == "Appropriate"
+    assert out.confidence == pytest.approx(0.9)
+    assert "may I check the wound" in canned_llm[0]
 
-@pytest.mark.asyncio
-async def test_knowledge_agent():
-    agent = KnowledgeAgent()
-    out = await agent.evaluate({
-        "step": "history",
-        "transcript": "Patient has diabetes and allergy to penicillin.",
-        "mcq_answers": {"q1": "A"},
-        "expected_mcq": {"q1": "A"}
-    })
-
-    assert out.agent == "knowledge"
-    assert out.score >= 0
-    assert out.confidence >= 0
-
-
-@pytest.mark.asyncio
-async def test_clinical_agent():
-    agent = ClinicalAgent()
-    out = await agent.evaluate({
-        "step": "cleaning",
-        "actions": [
-            {"action": "wash_hands"},
-            {"action": "don_gloves"},
-            {"action": "clean_wound"},
-            {"action": "apply_dressing"}
-        ]
-    })
-
-    assert out.agent == "clinical"
-    assert out.score == 1.0
-    assert out.raw["order_ok"] is True
+
+async def test_knowledge_agent(knowledge_agent, canned_llm):
+    out = await knowledge_agent.evaluate(
+        current_step="HISTORY",
+        student_input="Patient has diabetes and allergy to penicillin.",
+        scenario_metadata=SCENARIO_METADATA,
+        rag_response="Ask about allergies and chronic conditions.",
+    )
+
+    assert out.agent_name == "KnowledgeAgent"
+    assert out.verdict == "Appropriate"
+    assert "penicillin" in canned_llm[0]
+
+
+async def test_clinical_agent(clinical_agent, canned_llm):
+    out = await clinical_agent.evaluate(
+        current_step="CLEANING",
+        student_input="I will wash my hands, put on gloves and clean the wound.",
+        scenario_metadata=SCENARIO_METADATA,
+        rag_response="Clean from the incision outwards.",
+        actions=["action_handwash", "pick_material", "action_clean"],
+    )
+
+    assert out.agent_name == "ClinicalAgent"
+    assert out.verdict == "Appropriate"
+    assert "ACTION ORDER CHECK: correct" in canned_llm[0]
+
+
+async def test_clinical_agent_reports_order(clinical_agent, canned_llm):
+    kwargs = {
+        "current_step": "DRESSING",
+        "student_input": "I will dress the wound.",
+        "scenario_metadata": SCENARIO_METADATA,
+        "rag_response": "Clean before dressing.",
+    }
+
+    await clinical_agent.evaluate(
+        actions=["action_dress", "action_clean", "action_handwash"], **kwargs
+    )
+    await clinical_agent.evaluate(actions=["pick_material"], **kwargs)
+
+    assert "ACTION ORDER CHECK: OUT OF ORDER" in canned_llm[0]
+    assert "ACTION ORDER CHECK: not checked" in canned_llm[1]
+
+
+@pytest.mark.parametrize("actions, expected", [
+    (["action_handwash", "action_clean", "action_dress", "action_secure_dressing"], True),
+    (["action_handwash", "action_handwash", "action_clean"], True),
+    (["action_handwash", "pick_material", "action_clean"], True),
+    (["action_dress", "action_clean", "action_handwash"], False),
+    (["action_handwash", "action_dress"], False),
+    (["pick_material", "voice_transcript"], None),
+    ([], None),
+])
+def test_clinical_action_order(actions, expected):
+    from app.agents.clinical_agent import check_action_order
+
+    assert check_action_order(actions) is expected
 
 
 # ---------------------------------------------------------
 # 4. RAG LAYER TESTS
 # ---------------------------------------------------------
 
-@pytest.mark.asyncio
-async def test_vectorstore_query_stub():
+async def test_vectorstore_query_stub(vector_client):
     # Should return static dummy chunks
-    client = VectorClient()
-    chunks = await client.query("test query", "scenario_1", "history")
+    chunks = await vector_client.query("test query", "scenario_1", "history")
     assert isinstance(chunks, list)
     assert "content" in chunks[0]
 
-@pytest.mark.asyncio
-async def test_retriever_layer():
-    retriever = Retriever(vector_client=VectorClient())
+async def test_retriever_layer(retriever):
     ctx = await retriever.get_context("pain", "scenario_1", "history")
     assert isinstance(ctx, list)
     assert len(ctx) > 0
 
 
+async def test_retriever_batch(make_vector_client):
+    from app.rag.retriever import Retriever
+
+    fake = FakeOpenAI()
+    retriever = Retriever(vector_client=make_vector_client(fake))
+
+    queries = ["pain", "allergies", "pain"]
+    batched = await retriever.batch_get_context(queries, "scenario_1", "history")
+
+    # Results line up with the input order
+    assert [ctx[0]["content"] for ctx in batched] == [
+        "chunk for pain", "chunk for allergies", "chunk for pain"
+    ]
+    # The duplicate "pain" shares one search
+    assert sorted(fake.search_calls) == ["allergies", "pain"]
+    # Searches are scoped to the scenario (plus shared documents)
+    scenario_values = {f["value"] for f in fake.search_filters[0]["filters"]}
+    assert scenario_values == {"scenario_1", "shared"}
+
+
+def test_query_cache_lru_and_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("app.utils.query_cache.time.monotonic", lambda: now[0])
+
+    cache = QueryCache(max_size=2, ttl_seconds=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    # "b" is least recently used and is evicted
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+async def test_openai_client_survives_pool_close(monkeypatch):
+    from app.agents.communication_agent import CommunicationAgent
+    from app.core.http_client import close_http_client, get_http_client
+
+    monkeypatch.setattr("app.core.http_client.OPENAI_API_KEY", "test-key")
+
+    agent = CommunicationAgent()
+    before = agent.client
+
+    # What the app lifespan does on shutdown
+    await close_http_client()
+
+    after = agent.client
+    assert after is not before
+    assert not get_http_client().is_closed
+
+
+def test_semantic_cache_hit():
+    cache = SemanticCache(max_size=4, threshold=0.95)
+    scope = ("scenario_1", "history", 4)
+
+    # Stand-ins for embeddings of "pain" and "patient pain"
+    pain = np.array([1.0, 0.1, 0.0], dtype=np.float32)
+    patient_pain = np.array([0.98, 0.15, 0.02], dtype=np.float32)
+    allergies = np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+    cache.put(pain, scope, ["pain chunk"])
+
+    assert cache.get(patient_pain, scope) == ["pain chunk"]
+    assert cache.get(allergies, scope) is None
+    assert cache.get(patient_pain, ("scenario_2", "history", 4)) is None
+    assert cache.stats()["hits"] == 1
+
+
+async def test_semantic_tier_coalesces_and_tolerates_embed_errors(make_vector_client):
+    fake = FakeOpenAI()
+    vc = make_vector_client(fake, semantic_cache_enabled=True)
+
+    # Concurrent identical queries share one embedding call and one search
+    results = await asyncio.gather(
+        *(vc.query("wound pain", "scenario_1", "history") for _ in range(5))
+    )
+    assert all(r == results[0] for r in results)
+    assert fake.embed_calls == ["wound pain"]
+    assert fake.search_calls == ["wound pain"]
+
+    # A failing embedding endpoint counts as a miss, not a failed query
+    broken = FakeOpenAI(embed_error=RuntimeError("embeddings down"))
+    vc = make_vector_client(broken, semantic_cache_enabled=True)
+    result = await vc.query("wound pain", "scenario_1", "history")
+    assert result[0]["content"] == "chunk for wound pain"
+    assert broken.search_calls == ["wound pain"]
+
+
 # ---------------------------------------------------------
 # 5. SCENARIO LOADER + SESSION MANAGER
 # ---------------------------------------------------------
 
-@pytest.mark.asyncio
-async def test_scenario_loader():
-    loader = ScenarioLoader()
-    # load_scenario is async, so it needs to be awaited
-    data = await loader.load_scenario("scenario_1")
-    assert "scenario_id" in data
-    assert "patient_name" in data
-    assert "condition" in data
+async def test_scenario_loader(scenario_loader):
+    # load_scenario blocks on Firestore, as in the API routes
+    data = await asyncio.to_thread(scenario_loader, "scenario_1")
+    assert data["scenario_id"] == "scenario_1"
+    assert "patient_history" in data
+    assert "wound_details" in data
+
+
+def test_scenario_loader_cache(monkeypatch):
+    from app.services import scenario_loader as loader
+
+    stored = orjson.loads((_DATA_DIR / "scenario_test_001.json").read_bytes())
+
+    now = [0.0]
+    monkeypatch.setattr("app.utils.query_cache.time.monotonic", lambda: now[0])
+    monkeypatch.setattr(loader, "_cache", QueryCache(max_size=8, ttl_seconds=300))
+
+    calls = []
+
+    def counting_get_scenario(scenario_id):
+        calls.append(scenario_id)
+        # Hold the load open so concurrent callers pile up on the lock
+        time.sleep(0.05)
+        return dict(stored, scenario_id=scenario_id)
+
+    monkeypatch.setattr(loader, "get_scenario", counting_get_scenario)
+
+    # Concurrent cold loads of one id share a single read
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        loaded = list(pool.map(loader.load_scenario, ["scenario_1"] * 8))
+    assert calls == ["scenario_1"]
+    assert all(s == loaded[0] for s in loaded)
+
+    # Callers get copies; mutating one does not reach the cache
+    loaded[0]["title"] = "mutated"
+    assert loader.load_scenario("scenario_1")["title"] == stored["scenario_title"]
+    assert calls == ["scenario_1"]
+
+    loader.invalidate("scenario_1")
+    loader.load_scenario("scenario_1")
+    assert calls == ["scenario_1", "scenario_1"]
+
+    now[0] = 300.0
+    loader.load_scenario("scenario_1")
+    assert len(calls) == 3
+
+
+def _invalid_scenario():
+    scenario = orjson.loads((_DATA_DIR / "scenario_test_001.json").read_bytes())
+    scenario["assessment_questions"] = [
+        {"question": "Q1", "options": ["a"], "correct_answer": ""},
+        {"question": "Q2", "options": ["a", "b"], "correct_answer": " "},
+    ]
+    scenario["evaluation_criteria"] = []
+    return scenario
+
+
+def test_validate_scenario_full_report():
+    from app.utils.validators import validate_scenario_payload
+
+    # The admin create flow gets every problem in one message
+    with pytest.raises(ValueError) as exc:
+        validate_scenario_payload(_invalid_scenario(), fail_fast=False)
+
+    assert str(exc.value) == "; ".join([
+        "MCQ 1 must have at least 2 options",
+        "MCQ 1 correct_answer cannot be empty",
+        "MCQ 2 correct_answer cannot be empty",
+        "evaluation_criteria must be a dictionary",
+    ])
+
+
+def test_validate_scenario_fail_fast(monkeypatch):
+    from app.utils import validators
+
+    checked = []
+    real_mcq_errors = validators._iter_mcq_errors
 
+    def recording_mcq_errors(mcq, index):
+        checked.append(index)
+        return real_mcq_errors(mcq, index)
 
-def test_session_manager():
-    sm = SessionManager()
-    sid = sm.create_session("scenario_x", "student_99")
+    monkeypatch.setattr(validators, "_iter_mcq_errors", recording_mcq_errors)
 
-    session = sm.get_session(sid)
+    # Stops at the first problem, before the remaining MCQs are checked
+    with pytest.raises(ValueError, match="^MCQ 1 must have at least 2 options$"):
+        validators.validate_scenario_payload(_invalid_scenario())
+    assert checked == [0]
+
+    # Missing fields are reported without running any MCQ checks
+    scenario = _invalid_scenario()
+    del scenario["scenario_title"]
+    checked.clear()
+    for fail_fast in (True, False):
+        with pytest.raises(ValueError, match=r"^Missing required fields: \['scenario_title'\]$"):
+            validators.validate_scenario_payload(scenario, fail_fast=fail_fast)
+    assert checked == []
+
+
+async def test_session_manager(session_manager):
+    sm = session_manager
+    sid = await sm.create_session("scenario_x", "student_99")
+
+    session = await sm.get_session(sid)
     assert session["scenario_id"] == "scenario_x"
-    assert session["current_step"] == Step.HISTORY.value
+    assert session["current_step"] == Step.HISTORY
+
+    new_step = await sm.advance_step(sid)
+    assert new_step == Step.ASSESSMENT
+
+    # Event history is bounded and stays JSON-serializable
+    for i in range(15):
+        await sm.add_log(sid, {"i": i})
+    logs = (await sm.get_session(sid))["logs"]
+    assert logs == [{"i": i} for i in range(5, 15)]
+    orjson.dumps(await sm.get_session(sid))
+
+
+def test_session_manager_concurrent_advance(monkeypatch, session_manager):
+    from app.core.state_machine import next_step as real_next_step
+
+    def slow_next_step(step):
+        # Yield the GIL between reading and writing the step, so an
+        # unguarded read-modify-write in the store is interleaved
+        time.sleep(0.001)
+        return real_next_step(step)
+
+    monkeypatch.setattr("app.services.session_store.next_step", slow_next_step)
+
+    sm = session_manager
+    sid = asyncio.run(sm.create_session("scenario_x", "student_99"))
 
-    new_step = sm.advance_step(sid)
-    assert new_step == Step.ASSESSMENT.value
+    # Real threads, each with its own event loop, sharing one manager,
+    # as when the store is used from several worker threads
+    barrier = threading.Barrier(100)
 
+    def advance():
+        barrier.wait()
+        try:
+            return asyncio.run(sm.advance_step(sid))
+        except ValueError as e:
+            return e
 
-@pytest.mark.asyncio
-async def test_evaluation_service_payload():
-    # EvaluationService requires retriever and scenario_loader on init
-    evaluation_service = EvaluationService(retriever=Retriever(vector_client=VectorClient()), scenario_loader=ScenarioLoader())
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        results = list(pool.map(lambda _: advance(), range(100)))
+
+    advanced = [r for r in results if isinstance(r, Step)]
+    rejected = [r for r in results if isinstance(r, ValueError)]
+
+    # Every step is taken exactly once
+    assert sorted(advanced) == [Step.ASSESSMENT, Step.CLEANING, Step.DRESSING, Step.COMPLETED]
+    assert len(rejected) == 96
+    assert asyncio.run(sm.get_session(sid))["current_step"] == Step.COMPLETED
+
+
+async def test_redis_session_store_field_updates():
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.services.session_store import RedisSessionStore
+
+    store = RedisSessionStore("redis://test", client=fakeredis.FakeAsyncRedis())
+    sm = SessionManager(store=store)
+
+    sid = await sm.create_session("scenario_x", "student_99")
+    stale = await sm.get_session(sid)
+
+    # Another worker advances while this one still holds a stale snapshot
+    assert await sm.advance_step(sid) == Step.ASSESSMENT
+    await sm.store_last_evaluation(sid, {"composite_score": 0.8})
+    await sm.increment_attempt(sid)
+
+    session = await sm.get_session(sid)
+    assert stale["current_step"] == Step.HISTORY
+    assert session["current_step"] == Step.ASSESSMENT
+    assert session["last_evaluation"] == {"composite_score": 0.8}
+    assert session["attempt_count"] == {"assessment": 1}
+
+    # Interleaved transitions retry on WATCH conflicts instead of clobbering
+    results = await asyncio.gather(
+        *(sm.advance_step(sid) for _ in range(10)),
+        return_exceptions=True,
+    )
+    assert sorted(r for r in results if isinstance(r, Step)) == [
+        Step.CLEANING, Step.DRESSING, Step.COMPLETED
+    ]
+    assert (await sm.get_session(sid))["current_step"] == Step.COMPLETED
+
+    # Session keys and event lists expire instead of living forever
+    await sm.add_log(sid, {"i": 0})
+    for suffix in ("", ":attempts", ":logs"):
+        ttl = await store._redis.ttl(f"sess:{sid}{suffix}")
+        assert 0 < ttl <= store.ttl_seconds
+
+
+async def test_evaluation_service_payload(evaluation_service):
     # The service prepares the context payload for the agents.
     payload = await evaluation_service.prepare_agent_context(
         transcript="Patient has fever",
@@ -170,54 +736,209 @@ async def test_evaluation_service_payload():
         step="history"
     )
 
-    assert "transcript" in payload
-    assert "rag_chunks" in payload
+    assert payload["transcript"] == "Patient has fever"
+    assert "scenario_metadata" in payload
+    assert "rag_context" in payload
     assert payload["step"] == "history"
 
 
+async def test_evaluation_service_context_cache(monkeypatch, session_manager):
+    from app.services.evaluation_service import EvaluationService
+
+    calls = []
+
+    async def fake_rag(self, transcript, scenario_id):
+        calls.append(transcript)
+        return "guideline"
+
+    async def fake_load(self, scenario_id):
+        return {"scenario_id": scenario_id}
+
+    monkeypatch.setattr(EvaluationService, "_retrieve_rag_text", fake_rag)
+    monkeypatch.setattr(EvaluationService, "_load_scenario", fake_load)
+
+    service = EvaluationService(coordinator=Coordinator(), session_manager=session_manager)
+    first = await service.prepare_agent_context("Patient has fever", "scenario_1", "history")
+    second = await service.prepare_agent_context("Patient has fever", "scenario_1", "history")
+    await service.prepare_agent_context("Patient has fever", "scenario_1", "assessment")
+
+    assert first == second
+    assert len(calls) == 2
+    assert service.context_cache_stats()["hits"] == 1
+
+
 # ---------------------------------------------------------
 # 6. API ENDPOINTS
 # ---------------------------------------------------------
 
-def test_api_health():
-    res = client.get("/health")
+@pytest.fixture
+def api_scenario(monkeypatch, fastapi_app):
+    """
+    Serves a fixed scenario to /session/start, so API tests don't
+    depend on what is stored in Firestore.
+    """
+    scenario = {
+        "scenario_id": "scenario_1",
+        "title": "Post-operative Surgical Wound Care",
+        **SCENARIO_METADATA,
+        "assessment_questions": [],
+    }
+    monkeypatch.setattr(
+        "app.api.session_routes.load_scenario", lambda scenario_id: scenario
+    )
+    return scenario
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_health(async_client):
+    res = await async_client.get("/health")
     assert res.status_code == 200
-    assert res.json()["status"] == "ok"
+    assert orjson.loads(res.content)["status"] == "ok"
 
 
-def test_api_start_session():
-    res = client.post("/session/start", json={
-        "scenario_id": "scenario_1",
-        "student_id": "stu_1"
-    })
+@pytest.mark.xdist_group("api")
+async def test_api_start_session(async_client, api_scenario):
+    res = await async_client.post(
+        "/session/start", content=_START_JSON, headers=_JSON_HEADERS
+    )
 
     assert res.status_code == 200
-    body = res.json()
+    body = orjson.loads(res.content)
     assert "session_id" in body
     assert body["current_step"] == "history"
+    assert body["scenario_summary"]["title"] == api_scenario["title"]
 
 
-def test_api_step_flow():
+async def _run_history_step(async_client):
     # Start session
-    res = client.post("/session/start", json={
-        "scenario_id": "scenario_1",
-        "student_id": "stu_1"
-    })
-    sid = res.json()["session_id"]
+    res = await async_client.post(
+        "/session/start", content=_START_JSON, headers=_JSON_HEADERS
+    )
+    sid = orjson.loads(res.content)["session_id"]
 
     # Send fake evaluator outputs
-    res2 = client.post("/session/step", json={
-        "session_id": sid,
-        "step": "history",
-        "evaluator_outputs": [
-            {"agent": "communication", "score": 0.8, "confidence": 0.7, "rationale": "ok"},
-            {"agent": "knowledge", "score": 0.6, "confidence": 0.8, "rationale": "fine"}
-        ]
-    })
-
-    assert res2.status_code == 200
-    body = res2.json()
-
-    assert "evaluation" in body
-    assert "next_step" in body
-    assert body["next_step"] == "assessment"
+    return await async_client.post(
+        "/session/step", content=_history_step_json(sid), headers=_JSON_HEADERS
+    )
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_step_flow(async_client, api_scenario):
+    # Independent sessions progress concurrently on one event loop
+    responses = await asyncio.gather(
+        *(_run_history_step(async_client) for _ in range(3))
+    )
+
+    for res in responses:
+        assert res.status_code == 200
+        body = orjson.loads(res.content)
+
+        # HISTORY weights: communication 0.5, knowledge 0.4;
+        # "Partially Appropriate" scores 0.6 of the confidence
+        scores = body["evaluation"]["scores"]
+        assert scores["composite_score"] == pytest.approx(0.8 * 0.5 + 0.6 * 0.7 * 0.4)
+        assert set(scores["agent_scores"]) == {"CommunicationAgent", "KnowledgeAgent"}
+        assert body["next_step"] == "assessment"
+
+
+def _ndjson_lines(res):
+    return [orjson.loads(line) for line in res.content.splitlines()]
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_step_stream(async_client, api_scenario):
+    res = await async_client.post(
+        "/session/start", content=_START_JSON, headers=_JSON_HEADERS
+    )
+    sid = orjson.loads(res.content)["session_id"]
+
+    res = await async_client.post(
+        "/session/step/stream", content=_history_step_json(sid), headers=_JSON_HEADERS
+    )
+
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+
+    # One part per line, in the order they are produced
+    step_info, evaluation, transition = _ndjson_lines(res)
+    assert step_info == {"session_id": sid, "current_step": "history"}
+    assert set(evaluation["evaluation"]["scores"]["agent_scores"]) == {
+        "CommunicationAgent", "KnowledgeAgent"
+    }
+    assert transition == {"next_step": "assessment"}
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_step_stream_sends_step_info_first(monkeypatch, async_client, api_scenario):
+    from app.api import session_routes
+
+    res = await async_client.post(
+        "/session/start", content=_START_JSON, headers=_JSON_HEADERS
+    )
+    sid = orjson.loads(res.content)["session_id"]
+
+    evaluated = []
+    real_aggregate = session_routes.evaluation_service.aggregate_evaluations
+
+    async def recording_aggregate(**kwargs):
+        evaluated.append(kwargs["session_id"])
+        return await real_aggregate(**kwargs)
+
+    monkeypatch.setattr(
+        session_routes.evaluation_service, "aggregate_evaluations", recording_aggregate
+    )
+
+    # ASGITransport buffers the body, so drive the route directly to see
+    # what has run when the first line goes out
+    payload = session_routes.EvalInput.model_validate_json(_history_step_json(sid))
+    response = await session_routes.session_step_stream(payload)
+    lines = response.body_iterator
+
+    first = await lines.__anext__()
+    assert orjson.loads(first) == {"session_id": sid, "current_step": "history"}
+    assert evaluated == []
+
+    rest = [orjson.loads(line) async for line in lines]
+    assert evaluated == [sid]
+    assert [next(iter(part)) for part in rest] == ["evaluation", "next_step"]
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_step_stream_unknown_session(async_client):
+    res = await async_client.post(
+        "/session/step/stream",
+        content=_history_step_json("sess_missing"),
+        headers=_JSON_HEADERS,
+    )
+
+    # Raised before streaming starts, so it is a plain 404
+    assert res.status_code == 404
+    assert orjson.loads(res.content)["detail"] == "Session not found"
+
+
+@pytest.mark.xdist_group("api")
+async def test_api_step_stream_error_line(monkeypatch, async_client, api_scenario):
+    from app.api import session_routes
+
+    res = await async_client.post(
+        "/session/start", content=_START_JSON, headers=_JSON_HEADERS
+    )
+    sid = orjson.loads(res.content)["session_id"]
+
+    async def failing_aggregate(**kwargs):
+        raise RuntimeError("scoring down")
+
+    monkeypatch.setattr(
+        session_routes.evaluation_service, "aggregate_evaluations", failing_aggregate
+    )
+
+    res = await async_client.post(
+        "/session/step/stream", content=_history_step_json(sid), headers=_JSON_HEADERS
+    )
+
+    # Step info was already sent, so the failure arrives as the last line
+    assert res.status_code == 200
+    assert _ndjson_lines(res) == [
+        {"session_id": sid, "current_step": "history"},
+        {"error": "Evaluation aggregation failed: scoring down"},
+    ]
@@ -22,6 +22,7 @@ def query_vector_store(query: str, filter: dict = None, top_k: int = 4):
     }
     payload = {
         "query": query,
+        "max_num_results": top_k,
             # "filter": filter or {}
     }
     resp = requests.post(url, headers=headers, json=payload)